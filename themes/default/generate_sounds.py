@@ -2,118 +2,338 @@
 """
 Generate retro arcade-style sound effects for opencode-sfx.
 Inspired by Space Invaders, Pac-Man, and classic 8-bit games.
+
+Requires numpy and numba, plus ffmpeg on the PATH.
 """
 
+import functools
+import hashlib
+import math
 import numpy as np
-from pydub import AudioSegment
-from pydub.generators import Sine, Square, Sawtooth
-import io
-import struct
-import wave
+from numba import njit
 import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
 
 SAMPLE_RATE = 44100
+MP3_BITRATE = '192k'
 OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Fixed seed so the noise - and therefore the encoded MP3s - are reproducible
+NOISE_SEED = 0xA5C0FFEE
+_rng = np.random.default_rng(NOISE_SEED)
+
+# One cycle of a sine wave, plus a wrap-around sample so lookups can
+# interpolate past the last entry. Numba bakes it into the kernels as a
+# constant, so it is made read-only to keep it matching the compiled code
+WAVETABLE_SIZE = 4096
+SINE_TABLE = np.sin(2 * np.pi * np.arange(WAVETABLE_SIZE + 1) / WAVETABLE_SIZE).astype(np.float32)
+SINE_TABLE.flags.writeable = False
+
 
-def numpy_to_audio_segment(samples, sample_rate=SAMPLE_RATE):
-    """Convert numpy float array (-1 to 1) to pydub AudioSegment."""
-    # Clip and convert to 16-bit PCM
-    samples = np.clip(samples, -1.0, 1.0)
-    pcm = (samples * 32767).astype(np.int16)
+@njit(cache=True, fastmath=True)
+def _lookup(table, phase):
+    """Linearly interpolated wavetable read at phase (in cycles, 0 to 1)."""
+    pos = phase * (table.shape[0] - 1)
+    # Clamp in case rounding in the caller's wrap leaves phase at exactly 1.0
+    idx = min(max(int(pos), 0), table.shape[0] - 2)
+    return table[idx] + (pos - idx) * (table[idx + 1] - table[idx])
 
-    # Write to WAV in memory
-    buf = io.BytesIO()
-    with wave.open(buf, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sample_rate)
-        wf.writeframes(pcm.tobytes())
-    buf.seek(0)
-    return AudioSegment.from_wav(buf)
+
+@njit(cache=True, fastmath=True)
+def _square(freq, n, volume, sample_rate, out):
+    # Phase is kept in cycles, wrapped into [0, 1) for any frequency sign or
+    # size: the wave is high for the first half of each cycle, so a compare
+    # replaces sin + sign
+    phase = 0.0
+    phase_inc = freq / sample_rate
+    for i in range(n):
+        out[i] = volume if phase < 0.5 else -volume
+        phase += phase_inc
+        phase -= math.floor(phase)
 
 
 def square_wave(freq, duration_ms, volume=0.25, sample_rate=SAMPLE_RATE):
     """Generate a square wave - the classic 8-bit sound."""
-    t = np.linspace(0, duration_ms / 1000, int(sample_rate * duration_ms / 1000), endpoint=False)
-    wave = np.sign(np.sin(2 * np.pi * freq * t)) * volume
-    return wave
+    n_samples = int(sample_rate * duration_ms / 1000)
+    out = np.empty(n_samples, dtype=np.float32)
+    _square(float(freq), n_samples, float(volume), sample_rate, out)
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def _tone_env(freq, n, volume, attack_samples, decay_samples, vib_depth, vib_rate, sample_rate, out):
+    """Write an enveloped (optionally vibrato'd) square wave into out in a single pass."""
+    phase = 0.0
+    phase_inc = freq / sample_rate
+    vib_inc = 2 * math.pi * vib_rate / sample_rate
+    for i in range(n):
+        s = volume if phase < 0.5 else -volume
+        env = 1.0
+        if 0 < attack_samples < n and i < attack_samples:
+            env = i / attack_samples
+        elif 0 < decay_samples < n and i >= n - decay_samples:
+            env = (n - 1 - i) / decay_samples
+        out[i] = s * env
+        if vib_depth != 0.0:
+            phase += phase_inc * (1 + vib_depth * math.sin(vib_inc * i))
+        else:
+            phase += phase_inc
+        phase -= math.floor(phase)
+
+
+def square_tone(freq, duration_ms, volume=0.25, attack_ms=10, decay_ms=50,
+                vibrato_depth=0.0, vibrato_rate=0.0, sample_rate=SAMPLE_RATE):
+    """Generate an enveloped square wave - square_wave + apply_envelope fused.
+
+    vibrato_depth is the relative pitch swing (0.03 = +/-3%) at vibrato_rate Hz.
+    """
+    n_samples = int(sample_rate * duration_ms / 1000)
+    attack_samples = int(sample_rate * attack_ms / 1000)
+    decay_samples = int(sample_rate * decay_ms / 1000)
+    out = np.empty(n_samples, dtype=np.float32)
+    _tone_env(float(freq), n_samples, float(volume), attack_samples, decay_samples,
+              float(vibrato_depth), float(vibrato_rate), sample_rate, out)
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def _synth_notes(freqs, ns, offsets, vols, attack_ns, decay_ns, vib_depths, vib_rate, sample_rate, out):
+    """Write each note's enveloped square wave into its slice of out."""
+    for k in range(freqs.shape[0]):
+        start = offsets[k]
+        _tone_env(freqs[k], ns[k], vols[k], attack_ns[k], decay_ns[k], vib_depths[k], vib_rate,
+                  sample_rate, out[start:start + ns[k]])
+
+
+def synth_notes(freqs, durs_ms, vols, gap_ms=0, attack_ms=10, decay_ms=50,
+                vibrato_depth=0.0, vibrato_rate=0.0, sample_rate=SAMPLE_RATE):
+    """Generate a sequence of enveloped square notes, each followed by gap_ms of silence.
+
+    Notes are described column-wise: freqs, durs_ms, vols, attack_ms, decay_ms
+    and vibrato_depth may each be a per-note array or a single value shared by
+    every note.
+    """
+    # atleast_1d so an all-scalar call is a one-note sequence, not 0-d arrays
+    freqs, durs_ms, vols, attack_ms, decay_ms, vibrato_depth = np.broadcast_arrays(
+        *np.atleast_1d(freqs, durs_ms, vols, attack_ms, decay_ms, vibrato_depth))
+    ns = (sample_rate * durs_ms / 1000).astype(np.int64)
+    attack_ns = (sample_rate * attack_ms / 1000).astype(np.int64)
+    decay_ns = (sample_rate * decay_ms / 1000).astype(np.int64)
+    gap_samples = int(sample_rate * gap_ms / 1000)
+    offsets = np.concatenate(([0], np.cumsum(ns + gap_samples)))
+
+    out = np.zeros(offsets[-1], dtype=np.float32)
+    _synth_notes(freqs.astype(np.float64), ns, offsets, vols.astype(np.float64), attack_ns, decay_ns,
+                 vibrato_depth.astype(np.float64), float(vibrato_rate), sample_rate, out)
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def _saw(freq, n, volume, sample_rate, out):
+    phase = 0.0
+    phase_inc = freq / sample_rate
+    for i in range(n):
+        out[i] = (2 * (phase - math.floor(phase)) - 1) * volume
+        phase += phase_inc
 
 
 def saw_wave(freq, duration_ms, volume=0.25, sample_rate=SAMPLE_RATE):
     """Generate a sawtooth wave."""
-    t = np.linspace(0, duration_ms / 1000, int(sample_rate * duration_ms / 1000), endpoint=False)
-    wave = (2 * (freq * t % 1) - 1) * volume
-    return wave
+    n_samples = int(sample_rate * duration_ms / 1000)
+    out = np.empty(n_samples, dtype=np.float32)
+    _saw(float(freq), n_samples, float(volume), sample_rate, out)
+    return out
 
 
 def noise(duration_ms, volume=0.15, sample_rate=SAMPLE_RATE):
     """Generate white noise."""
     n_samples = int(sample_rate * duration_ms / 1000)
-    return np.random.uniform(-volume, volume, n_samples)
+    out = _rng.random(n_samples, dtype=np.float32, out=np.empty(n_samples, dtype=np.float32))
+    out *= 2 * volume
+    out -= volume
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def _sine(freq, n, volume, sample_rate, out):
+    phase = 0.0
+    phase_inc = freq / sample_rate
+    for i in range(n):
+        out[i] = _lookup(SINE_TABLE, phase) * volume
+        phase += phase_inc
+        phase -= math.floor(phase)
 
 
 def sine_wave(freq, duration_ms, volume=0.25, sample_rate=SAMPLE_RATE):
     """Generate a sine wave."""
-    t = np.linspace(0, duration_ms / 1000, int(sample_rate * duration_ms / 1000), endpoint=False)
-    return np.sin(2 * np.pi * freq * t) * volume
+    n_samples = int(sample_rate * duration_ms / 1000)
+    out = np.empty(n_samples, dtype=np.float32)
+    _sine(float(freq), n_samples, float(volume), sample_rate, out)
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def _sweep_sin(start_freq, end_freq, n, volume, sample_rate, out):
+    freq_step = (end_freq - start_freq) / (n - 1) if n > 1 else 0.0
+    phase = 0.0
+    for i in range(n):
+        out[i] = _lookup(SINE_TABLE, phase) * volume
+        phase += (start_freq + freq_step * i) / sample_rate
+        phase -= math.floor(phase)
+
+
+@njit(cache=True, fastmath=True)
+def _sweep_square(start_freq, end_freq, n, volume, sample_rate, out):
+    freq_step = (end_freq - start_freq) / (n - 1) if n > 1 else 0.0
+    phase = 0.0
+    for i in range(n):
+        out[i] = volume if phase < 0.5 else -volume
+        phase += (start_freq + freq_step * i) / sample_rate
+        phase -= math.floor(phase)
+
+
+@njit(cache=True, fastmath=True)
+def _sweep_saw(start_freq, end_freq, n, volume, sample_rate, out):
+    freq_step = (end_freq - start_freq) / (n - 1) if n > 1 else 0.0
+    phase = 0.0
+    for i in range(n):
+        out[i] = (2 * (phase - math.floor(phase)) - 1) * volume
+        phase += (start_freq + freq_step * i) / sample_rate
+
+
+_SWEEP_KERNELS = {
+    'square': _sweep_square,
+    'saw': _sweep_saw,
+    'sine': _sweep_sin,
+}
 
 
 def frequency_sweep(start_freq, end_freq, duration_ms, wave_type='square', volume=0.25, sample_rate=SAMPLE_RATE):
     """Generate a frequency sweep (ascending or descending)."""
-    t = np.linspace(0, duration_ms / 1000, int(sample_rate * duration_ms / 1000), endpoint=False)
-    freqs = np.linspace(start_freq, end_freq, len(t))
-    phase = np.cumsum(freqs / sample_rate) * 2 * np.pi
-
-    if wave_type == 'square':
-        return np.sign(np.sin(phase)) * volume
-    elif wave_type == 'saw':
-        return (2 * ((np.cumsum(freqs / sample_rate)) % 1) - 1) * volume
-    else:
-        return np.sin(phase) * volume
+    n_samples = int(sample_rate * duration_ms / 1000)
+    return frequency_sweep_n(start_freq, end_freq, n_samples, wave_type, volume, sample_rate)
 
 
-def apply_envelope(samples, attack_ms=10, decay_ms=50, sample_rate=SAMPLE_RATE):
-    """Apply attack/decay envelope to avoid clicks."""
-    attack_samples = int(sample_rate * attack_ms / 1000)
-    decay_samples = int(sample_rate * decay_ms / 1000)
+def frequency_sweep_n(start_freq, end_freq, n_samples, wave_type='square', volume=0.25, sample_rate=SAMPLE_RATE):
+    """Generate a frequency sweep with an exact sample count, e.g. to match another buffer."""
+    out = np.empty(n_samples, dtype=np.float32)
+    kernel = _SWEEP_KERNELS.get(wave_type, _sweep_sin)
+    kernel(float(start_freq), float(end_freq), n_samples, float(volume), sample_rate, out)
+    return out
 
-    envelope = np.ones(len(samples))
-    if attack_samples > 0 and attack_samples < len(samples):
-        envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
-    if decay_samples > 0 and decay_samples < len(samples):
-        envelope[-decay_samples:] = np.linspace(1, 0, decay_samples)
 
-    return samples * envelope
+# Compile the kernels the generators use at import so the JIT cost is paid
+# once, not per sound. The wrappers pass scalars as floats, so these are the
+# only signatures that ever get compiled
+square_wave(440, 1, volume=0.1)
+square_tone(440, 1, volume=0.1, attack_ms=0.1, decay_ms=0.1, vibrato_depth=0.03, vibrato_rate=8)
+synth_notes([440], [1], 0.1, attack_ms=0.1, decay_ms=0.1, vibrato_rate=8)
+sine_wave(440, 1, volume=0.1)
+frequency_sweep(440, 880, 1, wave_type='square', volume=0.1)
+frequency_sweep(440, 880, 1, wave_type='sine', volume=0.1)
 
 
-def concat_samples(*sample_arrays):
-    """Concatenate multiple sample arrays."""
-    return np.concatenate(sample_arrays)
+@functools.lru_cache(maxsize=64)
+def _envelope(n_samples, attack_samples, decay_samples):
+    """Build (and cache) the attack/decay envelope for a given shape."""
+    envelope = np.ones(n_samples, dtype=np.float32)
+    if attack_samples > 0 and attack_samples < n_samples:
+        envelope[:attack_samples] = np.linspace(0, 1, attack_samples, dtype=np.float32)
+    if decay_samples > 0 and decay_samples < n_samples:
+        envelope[-decay_samples:] = np.linspace(1, 0, decay_samples, dtype=np.float32)
+    # Shared between callers, so guard against accidental in-place edits
+    envelope.flags.writeable = False
+    return envelope
 
 
-def mix_samples(*sample_arrays):
-    """Mix multiple sample arrays together (must be same length)."""
-    max_len = max(len(s) for s in sample_arrays)
-    result = np.zeros(max_len)
-    for s in sample_arrays:
-        result[:len(s)] += s
-    return np.clip(result, -1.0, 1.0)
+def apply_envelope(samples, attack_ms=10, decay_ms=50, sample_rate=SAMPLE_RATE):
+    """Apply attack/decay envelope to avoid clicks."""
+    attack_samples = int(sample_rate * attack_ms / 1000)
+    decay_samples = int(sample_rate * decay_ms / 1000)
+    envelope = _envelope(len(samples), attack_samples, decay_samples)
+    return samples * envelope
 
 
-def silence(duration_ms, sample_rate=SAMPLE_RATE):
-    """Generate silence."""
-    return np.zeros(int(sample_rate * duration_ms / 1000))
+def layout(segments, sample_rate=SAMPLE_RATE):
+    """Lay out (samples, gap_ms) segments back to back in a single buffer.
+
+    Each segment is followed by gap_ms of silence. The gaps are left as the
+    zeros of the output buffer instead of being built and concatenated.
+    """
+    gaps = [int(sample_rate * gap_ms / 1000) for _, gap_ms in segments]
+    total = sum(len(samples) + gap for (samples, _), gap in zip(segments, gaps))
+    out = np.zeros(total, dtype=np.float32)
+    pos = 0
+    for (samples, _), gap in zip(segments, gaps):
+        out[pos:pos + len(samples)] = samples
+        pos += len(samples) + gap
+    return out
+
+
+def mix_samples(*sample_arrays, out=None):
+    """Mix multiple sample arrays together (must be same length).
+
+    Pass one of the inputs as `out` to mix into it in place instead of a new
+    buffer. Clipping is left to save_sound.
+    """
+    if out is None:
+        max_len = max(len(s) for s in sample_arrays)
+        out = np.zeros(max_len, dtype=np.float32)
+        sources = sample_arrays
+    else:
+        sources = [s for s in sample_arrays if s is not out]
+    for s in sources:
+        out[:len(s)] += s
+    return out
 
 
 def save_sound(samples, filename, gain_db=0):
     """Save samples as MP3 file with optional gain boost."""
-    seg = numpy_to_audio_segment(samples)
-    if gain_db != 0:
-        seg = seg + gain_db
+    # Fold the gain into the 16-bit scale so it costs one multiply, then clip
+    # in place and convert to little-endian PCM for ffmpeg
+    scaled = samples * (32767 * 10 ** (gain_db / 20))
+    np.clip(scaled, -32767, 32767, out=scaled)
+    pcm = scaled.astype('<i2')
+
     filepath = os.path.join(OUTPUT_DIR, filename)
-    seg.export(filepath, format='mp3', bitrate='192k')
-    print(f"  Saved: {filepath} ({len(seg)}ms, {seg.dBFS:.1f} dBFS)")
+    data = pcm.tobytes()
+
+    # Skip the encode when the PCM and encoder settings match the last run and
+    # the MP3 on disk is still the one that run wrote. The MP3s are tracked in
+    # git but the sidecar is not, so a checkout can swap the file underneath it
+    digest = hashlib.blake2b(data + f'|{SAMPLE_RATE}|{MP3_BITRATE}'.encode(), digest_size=16).hexdigest()
+    hashpath = filepath + '.hash'
+    if os.path.exists(filepath) and os.path.exists(hashpath):
+        st = os.stat(filepath)
+        with open(hashpath) as f:
+            if f.read() == f'{digest} {st.st_size} {st.st_mtime_ns}':
+                print(f"  Unchanged: {filepath}")
+                return
+
+    # LAME encodes on a single thread; the parallelism comes from running one
+    # generator (and so one ffmpeg) per pool worker
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-y', '-loglevel', 'error', '-f', 's16le', '-ar', str(SAMPLE_RATE), '-ac', '1',
+             '-i', 'pipe:0', '-threads', '1', '-b:a', MP3_BITRATE, filepath],
+            input=data, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg not found on PATH; it is needed to encode the MP3s") from None
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg failed to encode {filepath} (exit status {result.returncode}):\n"
+            f"{result.stderr.decode(errors='replace').strip()}"
+        )
+    st = os.stat(filepath)
+    with open(hashpath, 'w') as f:
+        f.write(f'{digest} {st.st_size} {st.st_mtime_ns}')
+
+    duration_ms = round(len(pcm) * 1000 / SAMPLE_RATE)
+    rms = np.sqrt(np.mean(pcm.astype(np.float64) ** 2))
+    dbfs = 20 * np.log10(rms / 32768) if rms > 0 else -np.inf
+    print(f"  Saved: {filepath} ({duration_ms}ms, {dbfs:.1f} dBFS)")
 
 
 # ============================================================
@@ -124,35 +344,17 @@ def generate_announce():
 
     # Pac-Man beginning jingle inspired - ascending arpeggio with that iconic feel
     # B4, C5, E5, B5 pattern with square waves
-    notes = [
-        (493.88, 80),   # B4
-        (523.25, 80),   # C5
-        (659.25, 80),   # E5
-        (493.88, 80),   # B4 (octave down)
-        (523.25, 100),  # C5
-        (659.25, 100),  # E5
-        (783.99, 120),  # G5
-        (987.77, 200),  # B5 - hold
-    ]
-
-    parts = []
-    for freq, dur in notes:
-        tone = square_wave(freq, dur, volume=0.22)
-        tone = apply_envelope(tone, attack_ms=5, decay_ms=30)
-        parts.append(tone)
-        parts.append(silence(20))  # tiny gap between notes
-
-    melody = concat_samples(*parts)
+    #                  B4      C5      E5      B4      C5      E5      G5      B5 - hold
+    freqs = np.array([493.88, 523.25, 659.25, 493.88, 523.25, 659.25, 783.99, 987.77])
+    durs_ms = np.array([80, 80, 80, 80, 100, 100, 120, 200])
+
+    # tiny gap between notes
+    melody = synth_notes(freqs, durs_ms, 0.22, gap_ms=20, attack_ms=5, decay_ms=30)
 
     # Add a shimmering high sine underneath
-    shimmer_len_ms = int(len(melody) / SAMPLE_RATE * 1000)
-    shimmer = frequency_sweep(1200, 2400, shimmer_len_ms, wave_type='sine', volume=0.06)
-    if len(shimmer) > len(melody):
-        shimmer = shimmer[:len(melody)]
-    elif len(shimmer) < len(melody):
-        shimmer = np.pad(shimmer, (0, len(melody) - len(shimmer)))
-
-    final = mix_samples(melody, shimmer)
+    shimmer = frequency_sweep_n(1200, 2400, len(melody), wave_type='sine', volume=0.06)
+
+    final = mix_samples(melody, shimmer, out=melody)
     final = apply_envelope(final, attack_ms=5, decay_ms=80)
 
     save_sound(final, 'announce.mp3')
@@ -166,31 +368,20 @@ def generate_question():
 
     # Classic coin-drop sound: two quick descending tones then a ring
     # Like inserting a quarter into an arcade machine
-    coin1 = square_wave(1800, 50, volume=0.25)
-    coin1 = apply_envelope(coin1, attack_ms=2, decay_ms=20)
-
-    gap1 = silence(30)
-
-    coin2 = square_wave(2400, 60, volume=0.25)
-    coin2 = apply_envelope(coin2, attack_ms=2, decay_ms=25)
-
-    gap2 = silence(40)
+    coin1 = square_tone(1800, 50, volume=0.25, attack_ms=2, decay_ms=20)
+    coin2 = square_tone(2400, 60, volume=0.25, attack_ms=2, decay_ms=25)
 
     # Resonant ring - like the coin settling
     ring = sine_wave(2800, 200, volume=0.20)
     ring_overtone = sine_wave(5600, 200, volume=0.08)
-    ring = mix_samples(ring, ring_overtone)
+    ring = mix_samples(ring, ring_overtone, out=ring)
     ring = apply_envelope(ring, attack_ms=5, decay_ms=150)
 
-    gap3 = silence(80)
-
     # Then a quick "bip bip" alert pattern - Space Invaders style
-    bip1 = square_wave(1000, 60, volume=0.22)
-    bip1 = apply_envelope(bip1, attack_ms=3, decay_ms=20)
-    bip2 = square_wave(1400, 80, volume=0.25)
-    bip2 = apply_envelope(bip2, attack_ms=3, decay_ms=30)
+    bip1 = square_tone(1000, 60, volume=0.22, attack_ms=3, decay_ms=20)
+    bip2 = square_tone(1400, 80, volume=0.25, attack_ms=3, decay_ms=30)
 
-    final = concat_samples(coin1, gap1, coin2, gap2, ring, gap3, bip1, silence(40), bip2)
+    final = layout([(coin1, 30), (coin2, 40), (ring, 80), (bip1, 40), (bip2, 0)])
     final = apply_envelope(final, attack_ms=2, decay_ms=60)
 
     save_sound(final, 'question.mp3')
@@ -203,25 +394,16 @@ def generate_idle1():
     print("Generating idle1.mp3...")
 
     # Quick ascending victory arpeggio - like eating a ghost in Pac-Man
-    notes = [
-        (523.25, 60),   # C5
-        (659.25, 60),   # E5
-        (783.99, 60),   # G5
-        (1046.50, 120), # C6 - hold longer
-    ]
-
-    parts = []
-    for freq, dur in notes:
-        tone = square_wave(freq, dur, volume=0.22)
-        tone = apply_envelope(tone, attack_ms=3, decay_ms=25)
-        parts.append(tone)
-        parts.append(silence(15))
+    #                  C5      E5      G5      C6 - hold longer
+    freqs = np.array([523.25, 659.25, 783.99, 1046.50])
+    durs_ms = np.array([60, 60, 60, 120])
+    arpeggio = synth_notes(freqs, durs_ms, 0.22, gap_ms=15, attack_ms=3, decay_ms=25)
 
     # Final flourish - descending wah
     flourish = frequency_sweep(1046.50, 1200, 150, wave_type='square', volume=0.18)
     flourish = apply_envelope(flourish, attack_ms=5, decay_ms=100)
 
-    final = concat_samples(*parts, flourish)
+    final = layout([(arpeggio, 0), (flourish, 0)])
     save_sound(final, 'idle1.mp3')
 
 
@@ -232,29 +414,15 @@ def generate_idle2():
     print("Generating idle2.mp3...")
 
     # Rhythmic "doo-doo-doo-DOOOO" pattern
-    pattern = [
-        (440.00, 70, 0.20),   # A4
-        (554.37, 70, 0.20),   # C#5
-        (659.25, 70, 0.22),   # E5
-        (880.00, 180, 0.25),  # A5 - triumphant hold
-    ]
-
-    parts = []
-    for freq, dur, vol in pattern:
-        tone = square_wave(freq, dur, volume=vol)
-        # Add slight vibrato on the last note
-        if dur > 100:
-            t = np.linspace(0, dur / 1000, len(tone), endpoint=False)
-            vibrato = 1 + 0.03 * np.sin(2 * np.pi * 8 * t)
-            tone_vib = square_wave(freq, dur, volume=vol)
-            # Resynth with vibrato
-            phase = np.cumsum((freq * vibrato) / SAMPLE_RATE) * 2 * np.pi
-            tone = np.sign(np.sin(phase)) * vol
-        tone = apply_envelope(tone, attack_ms=3, decay_ms=40)
-        parts.append(tone)
-        parts.append(silence(30))
-
-    final = concat_samples(*parts)
+    #                  A4      C#5     E5      A5 - triumphant hold
+    freqs = np.array([440.00, 554.37, 659.25, 880.00])
+    durs_ms = np.array([70, 70, 70, 180])
+    vols = np.array([0.20, 0.20, 0.22, 0.25])
+    # Add slight vibrato on the last note
+    vibrato_depth = np.array([0.0, 0.0, 0.0, 0.03])
+
+    final = synth_notes(freqs, durs_ms, vols, gap_ms=30, attack_ms=3, decay_ms=40,
+                        vibrato_depth=vibrato_depth, vibrato_rate=8)
     save_sound(final, 'idle2.mp3')
 
 
@@ -265,35 +433,20 @@ def generate_idle3():
     print("Generating idle3.mp3...")
 
     # Quick 8-bit fanfare: da-da-da-da DA-DA!
-    notes = [
-        (587.33, 50),   # D5
-        (659.25, 50),   # E5
-        (783.99, 50),   # G5
-        (880.00, 50),   # A5
-    ]
-
-    parts = []
-    for freq, dur in notes:
-        tone = square_wave(freq, dur, volume=0.20)
-        tone = apply_envelope(tone, attack_ms=3, decay_ms=20)
-        parts.append(tone)
-        parts.append(silence(15))
+    #                  D5      E5      G5      A5
+    freqs = np.array([587.33, 659.25, 783.99, 880.00])
+    fanfare = synth_notes(freqs, 50, 0.20, gap_ms=15, attack_ms=3, decay_ms=20)
 
     # Big finish - two strong hits
-    parts.append(silence(40))
-    hit1 = square_wave(1174.66, 80, volume=0.25)  # D6
-    hit1 = apply_envelope(hit1, attack_ms=3, decay_ms=30)
-    parts.append(hit1)
-    parts.append(silence(50))
+    hit1 = square_tone(1174.66, 80, volume=0.25, attack_ms=3, decay_ms=30)  # D6
 
     hit2 = square_wave(1318.51, 150, volume=0.25)  # E6
     # Add noise burst for punch
     hit2_noise = noise(150, volume=0.04)
-    hit2 = mix_samples(hit2, hit2_noise)
+    hit2 = mix_samples(hit2, hit2_noise, out=hit2)
     hit2 = apply_envelope(hit2, attack_ms=3, decay_ms=80)
-    parts.append(hit2)
 
-    final = concat_samples(*parts)
+    final = layout([(fanfare, 40), (hit1, 50), (hit2, 0)])
     save_sound(final, 'idle3.mp3')
 
 
@@ -304,25 +457,18 @@ def generate_error1():
     print("Generating error1.mp3...")
 
     # Classic descending spiral - like Pac-Man dying
-    parts = []
-    start_freq = 800
-    for i in range(8):
-        freq = start_freq * (0.85 ** i)  # Each note lower
-        dur = 60 + i * 10  # Each note slightly longer (slowing down)
-        tone = square_wave(freq, dur, volume=0.22)
-        tone = apply_envelope(tone, attack_ms=3, decay_ms=20)
-        parts.append(tone)
-        parts.append(silence(20))
+    steps = np.arange(8)
+    freqs = 800 * (0.85 ** steps)  # Each note lower
+    durs_ms = 60 + steps * 10  # Each note slightly longer (slowing down)
+    spiral = synth_notes(freqs, durs_ms, 0.22, gap_ms=20, attack_ms=3, decay_ms=20)
 
     # Final low thud
     thud = sine_wave(80, 200, volume=0.25)
     thud_noise = noise(200, volume=0.08)
-    thud = mix_samples(thud, thud_noise)
+    thud = mix_samples(thud, thud_noise, out=thud)
     thud = apply_envelope(thud, attack_ms=10, decay_ms=150)
-    parts.append(silence(30))
-    parts.append(thud)
 
-    final = concat_samples(*parts)
+    final = layout([(spiral, 30), (thud, 0)])
     save_sound(final, 'error1.mp3')
 
 
@@ -336,43 +482,59 @@ def generate_error2():
     sweep = frequency_sweep(600, 80, 300, wave_type='square', volume=0.22)
     sweep = apply_envelope(sweep, attack_ms=5, decay_ms=100)
 
-    gap = silence(60)
-
     # Two short angry buzzes
     buzz1 = square_wave(120, 100, volume=0.25)
     buzz1_noise = noise(100, volume=0.10)
-    buzz1 = mix_samples(buzz1, buzz1_noise)
+    buzz1 = mix_samples(buzz1, buzz1_noise, out=buzz1)
     buzz1 = apply_envelope(buzz1, attack_ms=5, decay_ms=40)
 
     buzz2 = square_wave(90, 150, volume=0.25)
     buzz2_noise = noise(150, volume=0.12)
-    buzz2 = mix_samples(buzz2, buzz2_noise)
+    buzz2 = mix_samples(buzz2, buzz2_noise, out=buzz2)
     buzz2 = apply_envelope(buzz2, attack_ms=5, decay_ms=80)
 
     # Flat "wah-wah" ending (sad trombone but 8-bit)
-    wah1 = square_wave(300, 120, volume=0.18)
-    wah1 = apply_envelope(wah1, attack_ms=5, decay_ms=50)
-    wah2 = square_wave(280, 120, volume=0.18)
-    wah2 = apply_envelope(wah2, attack_ms=5, decay_ms=50)
-    wah3 = square_wave(250, 200, volume=0.18)
-    wah3 = apply_envelope(wah3, attack_ms=5, decay_ms=150)
-
-    final = concat_samples(sweep, gap, buzz1, silence(40), buzz2, silence(80), wah1, silence(30), wah2, silence(30), wah3)
+    wah1 = square_tone(300, 120, volume=0.18, attack_ms=5, decay_ms=50)
+    wah2 = square_tone(280, 120, volume=0.18, attack_ms=5, decay_ms=50)
+    wah3 = square_tone(250, 200, volume=0.18, attack_ms=5, decay_ms=150)
+
+    final = layout([(sweep, 60), (buzz1, 40), (buzz2, 80), (wah1, 30), (wah2, 30), (wah3, 0)])
     save_sound(final, 'error2.mp3')
 
 
 # ============================================================
 # Generate all sounds
 # ============================================================
+GENERATORS = [
+    generate_announce,
+    generate_question,
+    generate_idle1,
+    generate_idle2,
+    generate_idle3,
+    generate_error1,
+    generate_error2,
+]
+
+
+def run_generator(generate):
+    """Run one generator with its own noise stream.
+
+    Seeding per sound keeps each file's noise independent of which pool
+    worker runs it and what that worker generated before.
+    """
+    global _rng
+    _rng = np.random.default_rng([NOISE_SEED, *generate.__name__.encode()])
+    generate()
+
+
 if __name__ == '__main__':
     print(f"Output directory: {OUTPUT_DIR}\n")
 
-    generate_announce()
-    generate_question()
-    generate_idle1()
-    generate_idle2()
-    generate_idle3()
-    generate_error1()
-    generate_error2()
+    # The generators share no state and each ends in its own ffmpeg encode,
+    # so run them side by side rather than one after another
+    with ProcessPoolExecutor(max_workers=len(GENERATORS)) as executor:
+        futures = [executor.submit(run_generator, generate) for generate in GENERATORS]
+        for future in futures:
+            future.result()
 
     print("\nAll sounds generated!")